@@ -52,7 +52,7 @@ More information
 """
 
 
-from ncplib.client import connect as connect  # noqa
+from ncplib.client import connect as connect, ConnectionPool as ConnectionPool  # noqa
 from ncplib.connection import Connection as Connection, Response as Response, Field as Field  # noqa
 from ncplib.errors import (  # noqa
     NCPError as NCPError,
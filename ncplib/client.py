@@ -68,6 +68,19 @@ The return value of :meth:`Response.recv` is a :class:`Field`, representing a :t
     print(field["TSDC"])
 
 
+Reusing connections
+^^^^^^^^^^^^^^^^^^^
+
+Connecting to a :doc:`server` requires a network round trip and an NCP handshake. Use a :class:`ConnectionPool` to
+reuse connections between short-lived operations:
+
+.. code:: python
+
+    async with ncplib.ConnectionPool("127.0.0.1", 9999) as pool:
+        async with pool.acquire() as connection:
+            field = await connection.send("DSPC", "TIME", SAMP=1024, FCTR=1200).recv()
+
+
 Advanced usage
 ^^^^^^^^^^^^^^
 
@@ -78,45 +91,92 @@ API reference
 -------------
 
 .. autofunction:: connect
+
+.. autoclass:: ConnectionPool
+    :members:
 """
 from __future__ import annotations
 import asyncio
 import binascii
+from contextlib import asynccontextmanager
+from functools import lru_cache
 import getpass
-from functools import partial
 import logging
-import platform
 import ssl
-from typing import Optional
+from types import TracebackType
+from typing import Any, AsyncIterator, Callable, List, Optional, Set, Type, TypeVar
 import warnings
-from ncplib.connection import DEFAULT_TIMEOUT, _wait_for, _decode_remote_timeout, _handle_tunnel_args, Connection, Field
-from ncplib.errors import AuthenticationError, NetworkError, CommandError, CommandWarning, NCPWarning
-from ncplib.http import RE_HTTP_STATUS, decode_http_head
+from ncplib.connection import (
+    DEFAULT_TIMEOUT, STREAM_LIMIT, _wait_for, _decode_remote_timeout, _handle_tunnel_args, _load_client_id, Connection,
+    Field,
+)
+from ncplib.errors import (
+    NCPError, AuthenticationError, NetworkError, ConnectionClosed, CommandError, CommandWarning, NCPWarning,
+)
+from ncplib.http import decode_http_status
+
+
+T = TypeVar("T")
 
 
 logger = logging.getLogger(__name__)
 
 
-def _client_predicate(field: Field, *, auto_erro: bool, auto_warn: bool, auto_ackn: bool) -> bool:
+# The HTTP tunnel request, either side of the encoded credentials.
+TUNNEL_REQUEST_PREFIX = b"CONNECT ncp.service HTTP/1.1\r\nProxy-Authorization: Basic "
+TUNNEL_REQUEST_SUFFIX = b"\r\n\r\n"
+
+
+@lru_cache(maxsize=None)
+def _get_default_hostname() -> str:
+    # The platform module is slow to import, and only needed the first time a client connects.
+    import platform
+    return platform.node() or "python3-ncplib"
+
+
+def _create_client_predicate(
+    *, auto_erro: bool, auto_warn: bool, auto_ackn: bool,
+) -> Optional[Callable[[Field], bool]]:
+    # With no flags enabled, every field is accepted without a predicate call.
+    if not (auto_erro or auto_warn or auto_ackn):
+        return None
+    # Only the params and field names handled by the enabled flags need a closer look.
+    control_params: Set[str] = set()
+    control_names: Set[str] = set()
     if auto_erro:
-        error_detail = field.get("ERRO")
-        error_code = field.get("ERRC")
-        if error_detail is not None or error_code is not None:
-            raise CommandError(field, error_detail, error_code)  # type: ignore
-        # Ignore the rest of packet-level errors.
-        if field.name == "ERRO":  # pragma: no cover
-            return False
-    # Handle warnings.
+        control_params.update(("ERRO", "ERRC"))
+        control_names.add("ERRO")
     if auto_warn:
-        warning_detail = field.get("WARN")
-        warning_code = field.get("WARC")
-        if warning_detail is not None or warning_code is not None:
-            warnings.warn(CommandWarning(field, warning_detail, warning_code))  # type: ignore
-        # Ignore the rest of packet-level warnings.
-        if field.name == "WARN":  # pragma: no cover
-            return False
-    # Handle acks.
-    return not auto_ackn or "ACKN" not in field
+        control_params.update(("WARN", "WARC"))
+        control_names.add("WARN")
+    if auto_ackn:
+        control_params.add("ACKN")
+
+    def client_predicate(field: Field) -> bool:
+        # Fast path for the common case of a field with no control params.
+        if field.keys().isdisjoint(control_params) and field.name not in control_names:
+            return True
+        if auto_erro:
+            error_detail = field.get("ERRO")
+            error_code = field.get("ERRC")
+            if error_detail is not None or error_code is not None:
+                raise CommandError(field, error_detail, error_code)  # type: ignore
+            # Ignore the rest of packet-level errors.
+            if field.name == "ERRO":  # pragma: no cover
+                return False
+        # Handle warnings.
+        if auto_warn:
+            warning_detail = field.get("WARN")
+            warning_code = field.get("WARC")
+            if warning_detail is not None or warning_code is not None:
+                warnings.warn(CommandWarning(field, warning_detail, warning_code))  # type: ignore
+            # Ignore the rest of packet-level warnings.
+            if field.name == "WARN":  # pragma: no cover
+                return False
+        # Handle acks.
+        return not auto_ackn or "ACKN" not in field
+
+    return client_predicate
 
 
 async def connect(
@@ -132,6 +192,7 @@ async def connect(
     ssl: bool | ssl.SSLContext = False,
     username: str = "",
     password: str = "",
+    pipeline_auth: bool = False,
 ) -> Connection:
     """
     Connects to a :doc:`server`.
@@ -155,6 +216,8 @@ async def connect(
         Node.
     :param str password: Authenticate with the Node using the given password. Requires authentication support on the
         Node.
+    :param bool pipeline_auth: Send the ``CCRE`` and ``CARE`` handshake packets together, without waiting for the
+        ``SCAR`` reply in between. Saves a network round trip when connecting. Requires pipelining support on the Node.
     :raises ncplib.NCPError: if the NCP connection failed.
     :return: The client :class:`Connection`.
     :rtype: Connection
@@ -166,40 +229,46 @@ async def connect(
         host, port,
         ssl=ssl,
         ssl_handshake_timeout=timeout if ssl else None,
+        limit=STREAM_LIMIT,
     ), timeout)
     # Connect via HTTP tunnel.
     if is_tunnel:
-        writer.write((
-            b"CONNECT ncp.service HTTP/1.1\r\n"
-            b"Proxy-Authorization: Basic %s\r\n"
-            b"\r\n"
-        ) % binascii.b2a_base64(f"{username}:{password}".encode(), newline=False))
+        writer.writelines((
+            TUNNEL_REQUEST_PREFIX,
+            binascii.b2a_base64(f"{username}:{password}".encode(), newline=False),
+            TUNNEL_REQUEST_SUFFIX,
+        ))
         # Check authentication success.
-        (status, message), _ = await _wait_for(decode_http_head(RE_HTTP_STATUS, reader), timeout)
+        status, message = await _wait_for(decode_http_status(reader), timeout)
         if status == "401":
             raise AuthenticationError(f"HTTP {status} {message}")
         elif status != "200":  # pragma: no cover
             raise NetworkError(f"HTTP {status} {message}")
     # Create the NCP connection.
+    await _load_client_id()
     connection = Connection(
-        reader, writer, partial(_client_predicate, auto_erro=auto_erro, auto_warn=auto_warn, auto_ackn=auto_ackn),
+        reader, writer, _create_client_predicate(auto_erro=auto_erro, auto_warn=auto_warn, auto_ackn=auto_ackn),
         logger=logger,
         remote_hostname=f"{host}:{port}" if remote_hostname is None else remote_hostname,
         timeout=timeout,
     )
     # Handle auth.
     try:
-        hostname = hostname or platform.node() or "python3-ncplib"
+        hostname = hostname or _get_default_hostname()
         connection_username = connection_username or getpass.getuser()
         connection_domain = connection_domain or ""
         # Read the initial LINK HELO packet.
         await connection.recv_field("LINK", "HELO")
         # Send the connection request.
         connection.send("LINK", "CCRE", CIW=hostname, CUSR=connection_username, CDOM=connection_domain, LINK=timeout)
+        # Send the auth request packet in the same write as the connection request.
+        if pipeline_auth:
+            connection.send("LINK", "CARE", CAR=hostname)
         # Read the connection response packet.
         remote_timeout = _decode_remote_timeout(await connection.recv_field("LINK", "SCAR"))
         # Send the auth request packet.
-        connection.send("LINK", "CARE", CAR=hostname)
+        if not pipeline_auth:
+            connection.send("LINK", "CARE", CAR=hostname)
         # Read the auth response packet.
         await connection.recv_field("LINK", "SCON")
     except BaseException:
@@ -212,3 +281,141 @@ async def connect(
     connection._apply_remote_timeout(remote_timeout)
     # All done!
     return connection
+
+
+async def _close_connection(connection: Connection) -> None:
+    # Errors while closing are logged, so they don't hide any error that caused the close, or stop other connections
+    # from closing.
+    if not connection.is_closing():
+        connection.close()
+    try:
+        await connection.wait_closed()
+    except NCPError as ex:
+        logger.warning("Connection error from %s over NCP: %s", connection.remote_hostname, ex)
+
+
+class ConnectionPool:
+
+    """
+    A pool of reusable client :class:`Connection` instances to a single :doc:`server`.
+
+    Connections are created on demand by :func:`connect`, and returned to the pool for reuse when released. Idle
+    connections are kept alive by the usual ``LINK`` keep-alive packets.
+
+    Connection pools can be used as *async context managers* to automatically close all idle connections:
+
+    .. code:: python
+
+        async with ncplib.ConnectionPool("127.0.0.1", 9999) as pool:
+            pass
+
+        # Idle connections are automatically closed.
+
+    :param str host: The hostname of the :doc:`server`. This can be an IP address or domain name.
+    :param int port: The port number of the :doc:`server`.
+    :param int max_size: The maximum number of connections open at once. Calls to :meth:`acquire` wait for a
+        connection to be released when the pool is full.
+    :param \\**kwargs: Keyword arguments passed to :func:`connect`.
+    """
+
+    __slots__ = ("_host", "_port", "_kwargs", "_max_size", "_semaphore", "_idle_connections", "_closed")
+
+    _host: str
+    _port: Optional[int]
+    _kwargs: Any
+    _max_size: int
+    _semaphore: Optional[asyncio.Semaphore]
+    _idle_connections: List[Connection]
+    _closed: bool
+
+    def __init__(self, host: str, port: Optional[int] = None, *, max_size: int = 10, **kwargs: Any) -> None:
+        assert max_size > 0, "max_size must be greater than 0"
+        self._host = host
+        self._port = port
+        self._kwargs = kwargs
+        self._max_size = max_size
+        self._semaphore = None
+        self._idle_connections = []
+        self._closed = False
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Connection]:
+        """
+        Acquires a :class:`Connection` from the pool, connecting to the :doc:`server` if no idle connection is
+        available.
+
+        Use the return value as an *async context manager*. The connection is returned to the pool when the block
+        exits, or closed if the block raises an exception or the pool has been closed.
+
+        .. code:: python
+
+            async with pool.acquire() as connection:
+                pass
+
+        :raises ncplib.ConnectionClosed: if the pool has been closed.
+        :raises ncplib.NCPError: if a new connection could not be established.
+        """
+        if self._closed:
+            raise ConnectionClosed("Connection pool closed")
+        # Before Python 3.10, a semaphore binds to the current event loop when created, so it's created on first use.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_size)
+        async with self._semaphore:
+            # The pool may have closed while waiting for a connection to be released.
+            if self._closed:
+                raise ConnectionClosed("Connection pool closed")
+            connection = await self._get_connection()
+            try:
+                yield connection
+            except BaseException:
+                await _close_connection(connection)
+                raise
+            if not connection.is_closing():
+                # Connections released after the pool closed are closed, not pooled.
+                if self._closed:
+                    await _close_connection(connection)
+                else:
+                    self._idle_connections.append(connection)
+
+    async def _get_connection(self) -> Connection:
+        # Reuse the most recently released connection that is still open.
+        while self._idle_connections:
+            connection = self._idle_connections.pop()
+            if connection.is_closing():
+                continue
+            # Anything received while idle is a keep-alive or a reply meant for a previous user. Once it's discarded, a
+            # connection closed by the server has nothing more to read, even though it's not marked as closing.
+            try:
+                await connection._discard_received()
+            except NCPError:  # pragma: no cover
+                await _close_connection(connection)
+                continue
+            if connection._reader.at_eof():
+                await _close_connection(connection)
+                continue
+            return connection
+        return await connect(self._host, self._port, **self._kwargs)
+
+    async def close(self) -> None:
+        """
+        Closes all idle connections in the pool. Connections in use are closed when released, and no more
+        connections can be acquired.
+
+        .. hint::
+
+            If you use the pool as an *async context manager*, there's no need to call :meth:`ConnectionPool.close`
+            manually.
+        """
+        self._closed = True
+        idle_connections = self._idle_connections
+        self._idle_connections = []
+        for connection in idle_connections:
+            connection.close()
+        for connection in idle_connections:
+            await _close_connection(connection)
+
+    async def __aenter__(self: T) -> T:
+        return self
+
+    async def __aexit__(self, exc_type: Optional[Type[T]], exc: Optional[T], tb: Optional[TracebackType]) -> None:
+        await self.close()
@@ -58,27 +58,30 @@ API reference
 """
 from __future__ import annotations
 import asyncio
-from async_timeout import timeout
-from datetime import datetime, timezone
+from datetime import datetime
+from functools import lru_cache
 from itertools import cycle
 import logging
-from time import time
+import socket
+import sys
+from time import time, time_ns
 from types import TracebackType
 from typing import AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Set, Tuple, Type, TypeVar
-from uuid import getnode as get_mac
 import warnings
 from ncplib.errors import NetworkError, NetworkTimeoutError, ConnectionClosed, DecodeError, DecodeWarning
-from ncplib.packets import Packet, Param, Params, Fields, encode_packet, decode_packet_cps, PACKET_HEADER_SIZE
+from ncplib.packets import Packet, Param, Params, Fields, _encode_packet, decode_packet_cps, PACKET_HEADER_SIZE
+if sys.version_info >= (3, 11):  # pragma: no cover
+    from asyncio import timeout
+else:  # pragma: no cover
+    from async_timeout import timeout
 
 
 T = TypeVar("T")
 
 
-# The last four bytes of the MAC address is used as an ID field.
-CLIENT_ID = get_mac().to_bytes(6, "little")[-4:]
-
-# The footer and other metadata for the LINK heartbeat packet trailer.
-LINK_TRAILER = b"".join((b'\x00\x00\x00\x00', CLIENT_ID, b'\x00\x00\x00\x00\xaa\xbb\xcc\xdd'))
+# The stream reader buffer limit. Data packets are often larger than the 64 KiB asyncio default, which would pause
+# and resume the transport several times per packet.
+STREAM_LIMIT = 2 ** 20
 
 # ID generation.
 _gen_id = cycle(range(2 ** 32)).__next__
@@ -87,6 +90,27 @@ _gen_id = cycle(range(2 ** 32)).__next__
 DEFAULT_TIMEOUT: int = 60
 
 
+@lru_cache(maxsize=None)
+def _get_client_id() -> bytes:
+    # The last four bytes of the MAC address is used as an ID field. Looking up the MAC address can be slow, so it's
+    # deferred until the first connection, and loaded off the event loop by _load_client_id().
+    from uuid import getnode as get_mac
+    return get_mac().to_bytes(6, "little")[-4:]
+
+
+async def _load_client_id() -> None:
+    # Looking up the MAC address can fall back to slow platform probes, so the first lookup runs in an executor
+    # rather than blocking the event loop.
+    if _get_client_id.cache_info().currsize == 0:
+        await asyncio.get_running_loop().run_in_executor(None, _get_client_id)
+
+
+@lru_cache(maxsize=None)
+def _get_link_trailer() -> bytes:
+    # The footer and other metadata for the LINK heartbeat packet trailer.
+    return b"".join((b'\x00\x00\x00\x00', _get_client_id(), b'\x00\x00\x00\x00\xaa\xbb\xcc\xdd'))
+
+
 async def _wait_for(coro: Awaitable[T], ms: int) -> T:
     try:
         async with timeout(ms):
@@ -107,6 +131,14 @@ def _decode_remote_timeout(field: Field) -> int:
     return 0
 
 
+def _set_nodelay(writer: asyncio.StreamWriter) -> None:
+    # NCP is a chatty protocol of small packets, so Nagle's algorithm only adds latency. The default asyncio event
+    # loop already disables it for TCP sockets, but other event loops are not required to.
+    sock = writer.get_extra_info("socket")
+    if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6) and sock.type == socket.SOCK_STREAM:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
 def _handle_tunnel_args(port: Optional[int], ssl: bool, authenticate: bool) -> Tuple[int, bool]:
     default_port: int
     if ssl:
@@ -315,20 +347,31 @@ class Connection(AsyncIteratorMixin):
 
     """
 
+    __slots__ = (
+        "_loop", "logger", "_reader", "_predicate", "_field_buffer", "_timeout", "_writer", "_write_buffer",
+        "_write_handle", "_client_id", "_remote_timeout", "_link_send_interval", "_link_send_handle", "_last_send_time",
+        "remote_hostname",
+    )
+
     _loop: asyncio.AbstractEventLoop
     logger: logging.Logger
     _reader: asyncio.StreamReader
-    _predicate: Callable[[Field], bool]
+    _predicate: Optional[Callable[[Field], bool]]
     _field_buffer: List[Field]
     _timeout: int
     _writer: asyncio.StreamWriter
+    _write_buffer: List[bytes]
+    _write_handle: Optional[asyncio.Handle]
+    _client_id: bytes
     _remote_timeout: int
     _link_send_interval: int
     _link_send_handle: Optional[asyncio.Handle]
+    _last_send_time: float
     remote_hostname: str
 
     def __init__(
-        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, predicate: Callable[[Field], bool], *,
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+        predicate: Optional[Callable[[Field], bool]], *,
         logger: logging.Logger,
         remote_hostname: str,
         timeout: int,
@@ -343,10 +386,15 @@ class Connection(AsyncIteratorMixin):
         self._field_buffer = []
         self._timeout = timeout
         # Packet writing.
+        _set_nodelay(writer)
         self._writer = writer
+        self._write_buffer = []
+        self._write_handle = None
+        self._client_id = _get_client_id()
         self._remote_timeout = 0
         self._link_send_interval = 3
         self._link_send_handle = None
+        self._last_send_time = 0.0
         # Config.
         self.remote_hostname = remote_hostname
 
@@ -354,22 +402,53 @@ class Connection(AsyncIteratorMixin):
     def transport(self) -> asyncio.BaseTransport:
         """
         The :class:`asyncio.WriteTransport` used by this connection.
+
+        .. note::
+
+            Packets sent by :meth:`send` and :meth:`send_packet` are buffered until the end of the current event loop
+            iteration, and then written to the transport together. Data written directly to the transport can
+            overtake packets that are still buffered. Errors writing buffered packets are reported to the event
+            loop's exception handler, not raised by :meth:`send`.
         """
         return self._writer.transport
 
+    # Buffered writing.
+
+    def _write(self, data: bytes) -> None:
+        # Packets written in the same event loop iteration are coalesced into a single transport write.
+        self._write_buffer.append(data)
+        if self._write_handle is None:
+            self._write_handle = self._loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        if self._write_handle is not None:
+            self._write_handle.cancel()
+            self._write_handle = None
+        if self._write_buffer:
+            self._writer.write(b"".join(self._write_buffer))
+            self._write_buffer.clear()
+
     # Background tasks.
 
     def _send_link(self) -> None:
-        self._writer.write(b"".join((
+        self._write(b"".join((
             b'\xdd\xcc\xbb\xaaLINK\n\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00',
             int(time()).to_bytes(4, "little"),
-            LINK_TRAILER,
+            _get_link_trailer(),
         )))
         self.logger.debug("Sent keep-alive to %s over NCP", self.remote_hostname)
-        self._send_link_soon()
+        self._send_link_soon(self._link_send_interval)
+
+    def _send_link_soon(self, delay: float) -> None:
+        self._link_send_handle = self._loop.call_later(delay, self._send_link_due)
 
-    def _send_link_soon(self) -> None:
-        self._link_send_handle = self._loop.call_later(self._link_send_interval, self._send_link)
+    def _send_link_due(self) -> None:
+        # Packets sent since the LINK was scheduled defer it until a full interval after the last send.
+        delay = self._last_send_time + self._link_send_interval - self._loop.time()
+        if delay > 0:
+            self._send_link_soon(delay)
+        else:
+            self._send_link()
 
     def _apply_remote_timeout(self, remote_timeout: int) -> None:
         if remote_timeout == 0:
@@ -381,7 +460,7 @@ class Connection(AsyncIteratorMixin):
             self._remote_timeout = remote_timeout
             self._link_send_interval = int(remote_timeout * 0.66)
             # Send the first link packet in the future.
-            self._send_link_soon()
+            self._send_link_soon(self._link_send_interval)
 
     # Receiving fields.
 
@@ -401,6 +480,16 @@ class Connection(AsyncIteratorMixin):
             raise DecodeError(ex) from ex
         return decode_packet_body(body_buf)
 
+    async def _discard_received(self) -> None:
+        # Discards buffered fields and complete packets that were received but not read, without waiting for more data.
+        self._field_buffer = []
+        buffer: bytearray = self._reader._buffer  # type: ignore
+        while len(buffer) >= PACKET_HEADER_SIZE:
+            size_remaining, _ = decode_packet_cps(bytes(buffer[:PACKET_HEADER_SIZE]))
+            if len(buffer) < PACKET_HEADER_SIZE + size_remaining:
+                break
+            await self._recv_packet()
+
     async def recv(self) -> Field:
         """
         Waits for the next :class:`Field` received by the connection.
@@ -413,18 +502,20 @@ class Connection(AsyncIteratorMixin):
             # Return buffered fields.
             if self._field_buffer:
                 field = self._field_buffer.pop()
-                self.logger.debug(
-                    "Received field %s %s from %s over NCP",
-                    field.packet_type, field.name, self.remote_hostname
-                )
-                if self._predicate(field):  # type: ignore
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        "Received field %s %s from %s over NCP",
+                        field.packet_type, field.name, self.remote_hostname
+                    )
+                if self._predicate is None or self._predicate(field):  # type: ignore
                     return field
             packet_type, packet_id, packet_timestamp, packet_info, fields = await _wait_for(
                 self._recv_packet(),
                 self._timeout,
             )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Received packet %s from %s over NCP", packet_type, self.remote_hostname)
             # Store the fields in the field buffer.
-            self.logger.debug("Received packet %s from %s over NCP", packet_type, self.remote_hostname)
             self._field_buffer = [
                 Field(self, packet_type, packet_id, packet_timestamp, field_name, field_id, params)
                 for field_name, field_id, params in fields
@@ -449,17 +540,18 @@ class Connection(AsyncIteratorMixin):
     # Packet writing.
 
     def _send_packet(self, packet_type: str, fields: Fields) -> Response:
-        encoded_packet = encode_packet(packet_type, 1, datetime.now(tz=timezone.utc), CLIENT_ID, fields)
-        self._writer.write(encoded_packet)
-        self.logger.debug("Sent packet %s to %s over NCP", packet_type, self.remote_hostname)
-        expected_fields = set()
-        for field_name, field_id, params in fields:
-            self.logger.debug("Sent field %s %s to %s over NCP", packet_type, field_name, self.remote_hostname)
-            expected_fields.add((field_name, field_id))
+        # Timestamp the packet straight from the system clock, without creating a datetime.
+        packet_time, packet_nanotime = divmod(time_ns(), 1_000_000_000)
+        encoded_packet = _encode_packet(packet_type, 1, packet_time, packet_nanotime, self._client_id, fields)
+        self._write(encoded_packet)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Sent packet %s to %s over NCP", packet_type, self.remote_hostname)
+            for field_name, _, _ in fields:
+                self.logger.debug("Sent field %s %s to %s over NCP", packet_type, field_name, self.remote_hostname)
+        expected_fields = {(field_name, field_id) for field_name, field_id, _ in fields}
         # If the connection supports CCRE LINK, we can defer the LINK send.
-        if self._remote_timeout > 0 and self._link_send_handle is not None:
-            self._link_send_handle.cancel()
-            self._send_link_soon()
+        if self._remote_timeout > 0:
+            self._last_send_time = self._loop.time()
         # Create an iterator of response fields.
         return Response(self, packet_type, expected_fields)
 
@@ -534,7 +626,8 @@ class Connection(AsyncIteratorMixin):
         if self._link_send_handle is not None:
             self._link_send_handle.cancel()
             self._link_send_handle = None
-        # Close the connection.
+        # Close the connection, writing any buffered packets first.
+        self._flush()
         self._writer.close()
         self.logger.info("Disconnected from %s over NCP", self.remote_hostname)
 
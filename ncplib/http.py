@@ -10,10 +10,10 @@ RE_HTTP_STATUS = re.compile(r'^HTTP/1.1 (\d+) (.*?)$')
 RE_HTTP_REQUEST = re.compile(r'^(.*?) (.*?) HTTP/1.1$')
 
 
-async def decode_http_head(
+async def _read_http_head(
     pattern: "re.Pattern[str]",
     reader: asyncio.StreamReader,
-) -> Tuple[Tuple[str, ...], HTTPMessage]:
+) -> Tuple[Tuple[str, ...], bytes]:
     try:
         line_bytes, headers_bytes = (await reader.readuntil(b"\r\n\r\n")).split(b"\r\n", 1)
     except asyncio.IncompleteReadError as ex:  # pragma: no cover
@@ -23,10 +23,25 @@ async def decode_http_head(
     match = pattern.match(line)
     if match is None:  # pragma: no cover
         raise DecodeError(f"Invalid HTTP tunnel response: {line}")
+    # All done!
+    return match.groups(), headers_bytes
+
+
+async def decode_http_head(
+    pattern: "re.Pattern[str]",
+    reader: asyncio.StreamReader,
+) -> Tuple[Tuple[str, ...], HTTPMessage]:
+    groups, headers_bytes = await _read_http_head(pattern, reader)
     # Decode headers.
     try:
         headers = parse_headers(BytesIO(headers_bytes))
     except HTTPException as ex:  # pragma: no cover
         raise DecodeError(ex) from ex
     # All done!
-    return match.groups(), headers
+    return groups, headers
+
+
+async def decode_http_status(reader: asyncio.StreamReader) -> Tuple[str, ...]:
+    # Tunnel responses are only checked for their status, so the headers are read but not parsed.
+    groups, _ = await _read_http_head(RE_HTTP_STATUS, reader)
+    return groups
@@ -1,8 +1,9 @@
 from __future__ import annotations
 from array import array
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from struct import Struct
-from typing import Callable, Iterable, List, Tuple, Union
+from sys import intern
+from typing import Callable, Dict, Iterable, List, Tuple, Union
 import warnings
 from ncplib.errors import DecodeError, DecodeWarning
 from ncplib.values import u32, i64, u64, f64
@@ -12,9 +13,17 @@ from ncplib.values import u32, i64, u64, f64
 
 PACKET_HEADER_STRUCT = Struct("<4s4sII4sII4s")
 
-FIELD_HEADER_STRUCT = Struct("<4s3s1sI")
+FIELD_HEADER_STRUCT = Struct("<4sII")
 
-PARAM_HEADER_STRUCT = Struct("<4s3sB")
+PARAM_HEADER_STRUCT = Struct("<4sI")
+
+VALUE_I32_STRUCT = Struct("<i")
+
+VALUE_U32_STRUCT = Struct("<I")
+
+VALUE_I64_STRUCT = Struct("<q")
+
+VALUE_U64_STRUCT = Struct("<Q")
 
 VALUE_F32_STRUCT = Struct("<f")
 
@@ -32,6 +41,18 @@ PARAM_HEADER_SIZE = PARAM_HEADER_STRUCT.size
 PACKET_FOOTER_SIZE = 8
 
 
+# Timestamps.
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+# Field and param headers pack a 3-byte size (in 4-byte words) and a 1-byte type ID into a single u32 word.
+
+SIZE_MASK = 0xFFFFFF
+
+TYPE_ID_SHIFT = 24
+
+
 # Byte Iterables.
 
 PACKET_HEADER = b"\xdd\xcc\xbb\xaa"
@@ -42,6 +63,8 @@ PACKET_FOOTER = b"\xaa\xbb\xcc\xdd"
 
 PACKET_FOOTER_NO_CHECKSUM = b"\x00\x00\x00\x00" + PACKET_FOOTER
 
+PARAM_PADDING = tuple(b"\x00" * padding_size for padding_size in range(4))
+
 
 # Known type codes.
 
@@ -106,34 +129,29 @@ Packet = Tuple[str, int, datetime, bytes, Fields]
 
 
 def encode_packet(packet_type: str, packet_id: int, timestamp: datetime, info: bytes, fields: Fields) -> bytes:
-    timestamp = timestamp.astimezone(timezone.utc)
-    # Encode the header.
-    packet_header = bytearray(PACKET_HEADER_SIZE)
-    PACKET_HEADER_STRUCT.pack_into(
-        packet_header, 0,
-        PACKET_HEADER,  # Hardcoded packet header.
-        packet_type.encode(),
-        0,  # Placeholder for the packet size, which we will calculate soon.
-        packet_id,
-        PACKET_VERSION,
-        int(timestamp.timestamp()), timestamp.microsecond * 1000,
-        info,
+    # Convert the timestamp to seconds and nanoseconds since the epoch using exact integer arithmetic.
+    if timestamp.tzinfo is None:  # pragma: no cover
+        timestamp = timestamp.astimezone(timezone.utc)
+    timestamp_delta = timestamp - EPOCH
+    return _encode_packet(
+        packet_type, packet_id,
+        timestamp_delta.days * 86400 + timestamp_delta.seconds, timestamp_delta.microseconds * 1000,
+        info, fields,
     )
-    chunks: List[Bytes] = [packet_header]
+
+
+def _encode_packet(
+    packet_type: str, packet_id: int, packet_time: int, packet_nanotime: int, info: bytes, fields: Fields,
+) -> bytes:
+    # The packet header is packed last, once the packet size is known.
+    chunks: List[Bytes] = [b""]
     offset = PACKET_HEADER_SIZE
     # Write the packet fields.
     for field_name, field_id, params in fields:
         field_offset = offset
-        # Write the field header.
-        field_header = bytearray(FIELD_HEADER_SIZE)
-        FIELD_HEADER_STRUCT.pack_into(
-            field_header, 0,
-            field_name.encode(),
-            b"\x00\x00\x00",  # Placeholder for the field size, which we will calculate soom.
-            b"\x00",  # Field type ID is ignored.
-            field_id,
-        )
-        chunks.append(field_header)
+        # The field header is packed once the params are written, once the field size is known.
+        field_index = len(chunks)
+        chunks.append(b"")
         offset += FIELD_HEADER_SIZE
         # Write the params.
         for param_name, param_value in params:
@@ -171,25 +189,57 @@ def encode_packet(packet_type: str, packet_id: int, timestamp: datetime, info: b
             param_padding_size = -param_size % 4
             chunks.append(PARAM_HEADER_STRUCT.pack(
                 param_name.encode(),
-                ((param_size + param_padding_size) // 4).to_bytes(3, "little"),
-                param_type_id,
+                (param_size + param_padding_size) // 4 | param_type_id << TYPE_ID_SHIFT,
             ))
             # Write the param value.
             chunks.append(param_value)  # type: ignore
-            chunks.append(b"\x00" * param_padding_size)
+            if param_padding_size:
+                chunks.append(PARAM_PADDING[param_padding_size])
             offset += param_size + param_padding_size
-        # Write the field size.
-        field_header[4:7] = ((offset - field_offset) // 4).to_bytes(3, "little")[:3]
+        # Write the field header. The field type ID is ignored, and left as zero.
+        field_size = (offset - field_offset) // 4
+        if field_size > SIZE_MASK:  # pragma: no cover
+            raise ValueError(f"Field {field_name} is too large")
+        chunks[field_index] = FIELD_HEADER_STRUCT.pack(field_name.encode(), field_size, field_id)
     # Encode the packet footer.
     chunks.append(PACKET_FOOTER_NO_CHECKSUM)
-    # Write the packet size.
-    packet_header[8:12] = ((offset + PACKET_FOOTER_SIZE) // 4).to_bytes(4, "little")
+    # Write the packet header.
+    chunks[0] = PACKET_HEADER_STRUCT.pack(
+        PACKET_HEADER,  # Hardcoded packet header.
+        packet_type.encode(),
+        (offset + PACKET_FOOTER_SIZE) // 4,
+        packet_id,
+        PACKET_VERSION,
+        packet_time, packet_nanotime,
+        info,
+    )
     # All done!
     return b"".join(chunks)
 
 
 # PacketData decoding.
 
+ARRAY_TYPE_IDS_TO_TYPE_CODE = {
+    type_id: type_code
+    for type_code, type_id
+    in ARRAY_TYPE_CODES_TO_TYPE_ID.items()
+}
+
+# Decoded names, keyed by their raw bytes. Names come from a small vocabulary, so the limit only guards against a
+# misbehaving peer.
+NAME_CACHE_SIZE = 4096
+
+_name_cache: Dict[bytes, str] = {}
+
+
+def _decode_name(raw_name: bytes) -> str:
+    name = raw_name.rstrip(b" \x00").decode("latin1")
+    # Only cached names are interned, since interned strings may never be freed.
+    if len(_name_cache) < NAME_CACHE_SIZE:
+        name = _name_cache[raw_name] = intern(name)
+    return name
+
+
 def decode_packet_cps(header_buf: Bytes) -> Tuple[int, Callable[[Bytes], Packet]]:
     (
         packet_header,
@@ -217,75 +267,60 @@ def decode_packet_cps(header_buf: Bytes) -> Tuple[int, Callable[[Bytes], Packet]
         fields = []
         while offset < field_limit:
             # Decode field header.
-            field_name, field_size, field_type_id, field_id = FIELD_HEADER_STRUCT.unpack_from(buf, offset)
-            param_limit = offset + int.from_bytes(field_size, "little") * 4
+            field_name, field_word, field_id = FIELD_HEADER_STRUCT.unpack_from(buf, offset)
+            param_limit = offset + (field_word & SIZE_MASK) * 4
             offset += FIELD_HEADER_SIZE
             # Decode params.
             params = []
             while offset < param_limit:
                 # Decode the param header.
-                param_name, param_size, param_type_id = PARAM_HEADER_STRUCT.unpack_from(buf, offset)
-                param_size = int.from_bytes(param_size, "little") * 4
-                # Decode the param value.
-                param_value_raw = buf[offset+PARAM_HEADER_SIZE:offset+param_size]
+                param_name, param_word = PARAM_HEADER_STRUCT.unpack_from(buf, offset)
+                param_size = (param_word & SIZE_MASK) * 4
+                param_type_id = param_word >> TYPE_ID_SHIFT
+                # Decode the param value. Scalar values are unpacked in-place, without slicing the buffer.
+                value_offset = offset + PARAM_HEADER_SIZE
                 param_value: Param
                 if param_type_id == TYPE_I32:
-                    param_value = int.from_bytes(param_value_raw, "little", signed=True)
+                    param_value = VALUE_I32_STRUCT.unpack_from(buf, value_offset)[0]
                 elif param_type_id == TYPE_U32:
-                    param_value = u32.from_bytes(param_value_raw, "little")
+                    param_value = u32(VALUE_U32_STRUCT.unpack_from(buf, value_offset)[0])
                 elif param_type_id == TYPE_STRING:
                     try:
-                        param_value = param_value_raw.split(b"\x00", 1)[0].decode()
+                        param_value = buf[value_offset:offset+param_size].split(b"\x00", 1)[0].decode()
                     except UnicodeDecodeError as ex:  # pragma: no cover
                         raise DecodeError(ex) from ex
                 elif param_type_id == TYPE_I64:
-                    param_value = i64.from_bytes(param_value_raw, "little", signed=True)
+                    param_value = i64(VALUE_I64_STRUCT.unpack_from(buf, value_offset)[0])
                 elif param_type_id == TYPE_U64:
-                    param_value = u64.from_bytes(param_value_raw, "little")
+                    param_value = u64(VALUE_U64_STRUCT.unpack_from(buf, value_offset)[0])
                 elif param_type_id == TYPE_F32:
-                    param_value = VALUE_F32_STRUCT.unpack(param_value_raw)[0]
+                    param_value = VALUE_F32_STRUCT.unpack_from(buf, value_offset)[0]
                 elif param_type_id == TYPE_F64:
-                    param_value = f64(VALUE_F64_STRUCT.unpack(param_value_raw)[0])
+                    param_value = f64(VALUE_F64_STRUCT.unpack_from(buf, value_offset)[0])
                 elif param_type_id == TYPE_RAW:
-                    param_value = bytes(param_value_raw)
-                elif param_type_id == TYPE_ARRAY_U8:
-                    param_value = array("B", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_U16:
-                    param_value = array("H", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_U32:
-                    param_value = array("I", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_I8:
-                    param_value = array("b", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_I16:
-                    param_value = array("h", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_I32:
-                    param_value = array("i", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_U64:
-                    param_value = array("L", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_I64:
-                    param_value = array("l", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_F32:
-                    param_value = array("f", param_value_raw)
-                elif param_type_id == TYPE_ARRAY_F64:
-                    param_value = array("d", param_value_raw)
+                    param_value = bytes(buf[value_offset:offset+param_size])
+                elif param_type_id in ARRAY_TYPE_IDS_TO_TYPE_CODE:
+                    # Copy array data straight from the buffer, avoiding an intermediate bytes slice.
+                    param_value = array(ARRAY_TYPE_IDS_TO_TYPE_CODE[param_type_id])
+                    param_value.frombytes(memoryview(buf)[value_offset:offset+param_size])
                 else:  # pragma: no cover
                     warnings.warn(DecodeWarning("Unsupported type ID", param_type_id))
-                # Store the param.
-                params.append((param_name.rstrip(b" \x00").decode("latin1"), param_value))
+                # Store the param. Names are interned, so lookups with string literals match by identity.
+                params.append((_name_cache.get(param_name) or _decode_name(param_name), param_value))
                 offset += param_size
                 # Check for param overflow.
                 if offset > param_limit:  # pragma: no cover
                     raise DecodeError(f"Parameter overflow by {offset - param_limit} bytes")
             # Store the field.
-            fields.append((field_name.rstrip(b" \x00").decode("latin1"), field_id, params))
+            fields.append((_name_cache.get(field_name) or _decode_name(field_name), field_id, params))
         # Check for field overflow.
         if offset > field_limit:  # pragma: no cover
             raise DecodeError(f"Field overflow by {offset - field_limit} bytes")
         # All done!
         return (
-            packet_type.rstrip(b" \x00").decode("latin1"),
+            _name_cache.get(packet_type) or _decode_name(packet_type),
             packet_id,
-            datetime.fromtimestamp(packet_time, tz=timezone.utc).replace(microsecond=packet_nanotime // 1000),
+            EPOCH + timedelta(seconds=packet_time, microseconds=packet_nanotime // 1000),
             packet_info,
             fields,
         )
@@ -126,7 +126,9 @@ from typing import Awaitable, Callable, Optional, Tuple, TypeVar
 import logging
 import ssl
 import warnings
-from ncplib.connection import DEFAULT_TIMEOUT, _wait_for, _decode_remote_timeout, _handle_tunnel_args, Connection, Field
+from ncplib.connection import (
+    DEFAULT_TIMEOUT, STREAM_LIMIT, _wait_for, _decode_remote_timeout, _handle_tunnel_args, _load_client_id, Connection,
+)
 from ncplib.http import RE_HTTP_REQUEST, decode_http_head
 from ncplib.errors import NCPError, NCPWarning
 
@@ -137,13 +139,9 @@ T = TypeVar("T")
 logger = logging.getLogger(__name__)
 
 
-def _server_predicate(field: Field) -> bool:
-    return True
-
-
 def _create_server_connecton(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: int) -> Connection:
     return Connection(
-        reader, writer, _server_predicate,
+        reader, writer, None,
         logger=logger,
         remote_hostname=":".join(map(str, writer.get_extra_info("peername")[:2])),
         timeout=timeout,
@@ -171,6 +169,7 @@ async def _client_connected(
     reader: asyncio.StreamReader,
     writer: asyncio.StreamWriter,
 ) -> None:
+    await _load_client_id()
     connection = _create_server_connecton(reader, writer, timeout)
     try:
         # Handle tunnel.
@@ -265,6 +264,7 @@ async def start_server(
         ssl=ssl,
         ssl_handshake_timeout=timeout if ssl else None,
         start_serving=start_serving,
+        limit=STREAM_LIMIT,
     ), timeout)
     for s in server.sockets:
         logger.info("Listening on %s:%s over NCP", *s.getsockname()[:2])
@@ -12,8 +12,11 @@ setup(
     packages=find_packages(exclude=["tests", "examples"]),
     package_data={"ncplib": ["py.typed"]},
     install_requires=[
-        "async_timeout>=3.0,<5.0",
+        "async_timeout>=3.0,<5.0; python_version<'3.11'",
     ],
+    extras_require={
+        "uvloop": ["uvloop; sys_platform!='win32'"],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Environment :: Web Environment",
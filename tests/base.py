@@ -20,11 +20,16 @@ class AsyncTestCase(unittest.TestCase):
         # All done!
         super().__init__(methodName)
 
+    # Helpers.
+
+    def createLoop(self) -> asyncio.AbstractEventLoop:
+        return asyncio.new_event_loop()
+
     # Fixtures.
 
     def setUp(self) -> None:
         super().setUp()
-        self.loop = asyncio.new_event_loop()
+        self.loop = self.createLoop()
         self.loop.set_debug(True)
         asyncio.set_event_loop(self.loop)
         self.addCleanup(asyncio.set_event_loop, None)
@@ -1,13 +1,24 @@
 from __future__ import annotations
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import platform
 from functools import partial
+import socket
 import ssl
-from typing import Any, Awaitable, Callable, Mapping, MutableMapping, Optional
+import threading
+from typing import Any, Awaitable, Callable, List, Mapping, MutableMapping, Optional
+import unittest
+from unittest import mock
+import uuid
 import ncplib
-from ncplib.packets import Param
+from ncplib.connection import _get_client_id, _get_link_trailer
+from ncplib.packets import Param, encode_packet
 from ncplib.server import _create_server_connecton
 from tests.base import AsyncTestCase
+try:
+    import uvloop
+except ImportError:  # pragma: no cover
+    uvloop = None  # type: ignore
 
 
 async def echo_server_handler(client: ncplib.Connection) -> None:
@@ -21,6 +32,11 @@ async def error_server_handler(client: ncplib.Connection) -> None:
     raise Exception("BOOM")
 
 
+async def close_server_handler(client: ncplib.Connection) -> None:
+    # Send a packet, so the client still has buffered data once the connection is closed.
+    client.send("LINK", "BYE")
+
+
 async def disconnect_server_handler(client_disconnected_event: asyncio.Event, client: ncplib.Connection) -> None:
     try:
         async for field in client:
@@ -69,6 +85,16 @@ class ClientServerTestCase(AsyncTestCase):
         self.addCleanup(self.loop.run_until_complete, client.__aexit__(None, None, None))  # type: ignore
         return client
 
+    async def createPool(
+        self,
+        client_connected: Callable[[ncplib.Connection], Awaitable[None]] = echo_server_handler,
+        **kwargs: Any,
+    ) -> ncplib.ConnectionPool:
+        port = await self.createServer(client_connected)
+        pool = ncplib.ConnectionPool("127.0.0.1", port, hostname="ncplib-test", **kwargs)
+        self.addCleanup(self.loop.run_until_complete, pool.close())
+        return pool
+
     async def createClientRaw(
         self,
         client_connected: Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]],
@@ -98,6 +124,7 @@ class ClientServerTestCase(AsyncTestCase):
             # Check the field structure.
             self.assertEqual(field.packet_type, packet_type)
             self.assertIsInstance(field.packet_timestamp, datetime)
+            self.assertLess(abs(datetime.now(tz=timezone.utc) - field.packet_timestamp), timedelta(seconds=5))
             self.assertIn(field.name, expected_fields)
             self.assertIsInstance(field.id, int)
             self.assertEqual(len(field), len(expected_fields[field.name]))
@@ -110,6 +137,19 @@ class ClientServerTestCase(AsyncTestCase):
         client = await self.createClient()
         self.assertIsInstance(client.transport, asyncio.WriteTransport)
 
+    async def testConnectionNoDelay(self) -> None:
+        async def client_connected(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            await reader.read()
+            writer.close()
+        port = await self.createServerRaw(client_connected)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # Event loops usually disable Nagle's algorithm already, so re-enable it first.
+        sock = writer.get_extra_info("socket")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+        self.assertFalse(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        async with _create_server_connecton(reader, writer, 60):
+            self.assertTrue(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+
     async def testSend(self) -> None:
         client = await self.createClient()
         response = client.send("LINK", "ECHO", FOO="BAR")
@@ -127,6 +167,30 @@ class ClientServerTestCase(AsyncTestCase):
         response = client.send_packet("LINK", ECHO={"FOO": "BAR"})
         await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
 
+    async def testSendCoalescesWrites(self) -> None:
+        client = await self.createClient()
+        writes = []
+        write = client._writer.write
+
+        def record_write(data: bytes) -> None:
+            writes.append(data)
+            write(data)
+
+        client._writer.write = record_write  # type: ignore
+        client.send("LINK", "ECHO", BAZ="QUX")
+        response = client.send("LINK", "ECHO", FOO="BAR")
+        await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+        self.assertEqual(len(writes), 1)
+
+    async def testSendDebugLogging(self) -> None:
+        client = await self.createClient()
+        with self.assertLogs("ncplib.client", "DEBUG") as cm:
+            response = client.send("LINK", "ECHO", FOO="BAR")
+            await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+        messages = [record.getMessage() for record in cm.records]
+        self.assertIn(f"Sent field LINK ECHO to {client.remote_hostname} over NCP", messages)
+        self.assertIn(f"Received field LINK ECHO from {client.remote_hostname} over NCP", messages)
+
     async def testRecvFieldConnectionFiltersMessages(self) -> None:
         client = await self.createClient()
         client.send("JUNK", "JUNK", JUNK="JUNK")
@@ -222,6 +286,63 @@ class ClientServerTestCase(AsyncTestCase):
         self.assertEqual(client._timeout, 60)
         self.assertEqual(client._link_send_interval, 39)
 
+    async def testClientDefaultHostname(self) -> None:
+        async def client_connected(client: ncplib.Connection) -> None:
+            self.assertEqual(client.remote_hostname, platform.node())
+            async for field in client:
+                field.send(ACKN=True)
+                field.send(**field)
+        port = await self.createServer(client_connected)
+        async with await ncplib.connect("127.0.0.1", port) as client:
+            response = client.send("LINK", "ECHO", FOO="BAR")
+            await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+
+    async def testClientIdLookupInExecutor(self) -> None:
+        lookup_threads: List[threading.Thread] = []
+
+        def getnode() -> int:
+            lookup_threads.append(threading.current_thread())
+            return 0x123456789abc
+
+        # Forget the cached client ID, and restore it afterwards.
+        _get_client_id.cache_clear()
+        _get_link_trailer.cache_clear()
+        self.addCleanup(_get_client_id.cache_clear)
+        self.addCleanup(_get_link_trailer.cache_clear)
+        with mock.patch.object(uuid, "getnode", getnode):
+            client = await self.createClient()
+        self.assertEqual(client._client_id, b"\x78\x56\x34\x12")
+        self.assertTrue(lookup_threads)
+        self.assertNotIn(threading.main_thread(), lookup_threads)
+
+    async def testSendDefersLink(self) -> None:
+        client = await self.createClient()
+        client._link_send_handle.cancel()  # type: ignore
+        response = client.send("LINK", "ECHO", FOO="BAR")
+        client._send_link_due()
+        self.assertEqual(len(client._write_buffer), 1)
+        self.assertGreater(client._link_send_handle.when(), self.loop.time() + 30)  # type: ignore
+        await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+
+    async def testSendLinkDue(self) -> None:
+        client = await self.createClient()
+        client._link_send_handle.cancel()  # type: ignore
+        client._send_link_due()
+        self.assertEqual(len(client._write_buffer), 1)
+        self.assertGreater(client._link_send_handle.when(), self.loop.time() + 30)  # type: ignore
+
+    async def testDiscardReceived(self) -> None:
+        client = await self.createClient()
+        packet = encode_packet("LINK", 1, datetime.now(tz=timezone.utc), b"INFO", [("ECHO", 1, [("FOO", "BAR")])])
+        # Buffer a complete packet, and the start of another.
+        client._reader.feed_data(packet + packet[:-4])
+        await client._discard_received()
+        self.assertEqual(len(client._reader._buffer), len(packet) - 4)  # type: ignore
+        # Once complete, the second packet is discarded too.
+        client._reader.feed_data(packet[-4:])
+        await client._discard_received()
+        self.assertEqual(len(client._reader._buffer), 0)  # type: ignore
+
     async def testClientGracefulDisconnect(self) -> None:
         client_disconnected_event = asyncio.Event()
         client = await self.createClient(partial(disconnect_server_handler, client_disconnected_event))
@@ -256,3 +377,192 @@ class ClientServerTestCase(AsyncTestCase):
         client = await self.createClient(ssl=ssl_ctx)
         response = client.send("LINK", "ECHO", FOO="BAR")
         await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+
+    async def testConnectionPool(self) -> None:
+        pool = await self.createPool()
+        async with pool.acquire() as client:
+            response = client.send("LINK", "ECHO", FOO="BAR")
+            await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+        async with pool.acquire() as reused_client:
+            response = reused_client.send("LINK", "ECHO", FOO="BAR")
+            await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+        self.assertIs(reused_client, client)
+
+    async def testConnectionPoolConcurrent(self) -> None:
+        pool = await self.createPool()
+        async with pool.acquire() as client_1, pool.acquire() as client_2:
+            self.assertIsNot(client_1, client_2)
+
+    async def testConnectionPoolMaxSize(self) -> None:
+        pool = await self.createPool(max_size=1)
+        acquire = pool.acquire()
+        async with pool.acquire() as client:
+            acquire_task = self.loop.create_task(acquire.__aenter__())
+            await asyncio.sleep(0.1)
+            self.assertFalse(acquire_task.done())
+        self.assertIs(await acquire_task, client)
+        await acquire.__aexit__(None, None, None)
+
+    def testConnectionPoolCreatedOutsideLoop(self) -> None:
+        port = self.loop.run_until_complete(self.createServer())
+        # Create the pool while a different event loop is current.
+        other_loop = asyncio.new_event_loop()
+        self.addCleanup(other_loop.close)
+        asyncio.set_event_loop(other_loop)
+        pool = ncplib.ConnectionPool("127.0.0.1", port, hostname="ncplib-test", max_size=1)
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.run_until_complete, pool.close())
+
+        async def send_echo() -> None:
+            async with pool.acquire() as client:
+                response = client.send("LINK", "ECHO", FOO="BAR")
+                await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+
+        # Contend for the only connection.
+        self.loop.run_until_complete(asyncio.wait_for(asyncio.gather(send_echo(), send_echo()), 6))
+
+    async def testConnectionPoolClosedConnection(self) -> None:
+        pool = await self.createPool()
+        async with pool.acquire() as client:
+            client.close()
+        async with pool.acquire() as new_client:
+            self.assertIsNot(new_client, client)
+
+    async def testConnectionPoolError(self) -> None:
+        pool = await self.createPool()
+        with self.assertRaises(ncplib.CommandError):
+            async with pool.acquire() as client:
+                await client.send("LINK", "ECHO", ERRO="Boom!", ERRC=10).recv()
+        self.assertTrue(client.is_closing())
+        async with pool.acquire() as new_client:
+            self.assertIsNot(new_client, client)
+
+    async def testConnectionPoolClosedIdleConnection(self) -> None:
+        pool = await self.createPool()
+        async with pool.acquire() as client:
+            pass
+        client.close()
+        async with pool.acquire() as new_client:
+            self.assertIsNot(new_client, client)
+
+    async def testConnectionPoolRemoteClosedIdleConnection(self) -> None:
+        pool = await self.createPool(close_server_handler)
+        async with pool.acquire() as client:
+            pass
+        # Wait for the server to close the connection.
+        while not client._reader._eof:  # type: ignore
+            await asyncio.sleep(0.01)
+        self.assertFalse(client._reader.at_eof())
+        self.assertFalse(client.is_closing())
+        async with pool.acquire() as new_client:
+            self.assertIsNot(new_client, client)
+        self.assertTrue(client.is_closing())
+
+    async def testConnectionPoolDiscardsIdleData(self) -> None:
+        pool = await self.createPool()
+        async with pool.acquire() as client:
+            response = client.send("LINK", "ECHO", FOO="STALE")
+            await asyncio.sleep(0.1)
+        async with pool.acquire() as reused_client:
+            response = reused_client.send("LINK", "ECHO", FOO="BAR")
+            await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+            self.assertEqual(reused_client._field_buffer, [])
+        self.assertIs(reused_client, client)
+
+    async def testConnectionPoolClosedInUse(self) -> None:
+        pool = await self.createPool()
+        async with pool.acquire() as client:
+            await pool.close()
+            self.assertFalse(client.is_closing())
+        self.assertTrue(client.is_closing())
+
+    async def testConnectionPoolClosedAcquire(self) -> None:
+        pool = await self.createPool()
+        await pool.close()
+        with self.assertRaises(ncplib.ConnectionClosed):
+            async with pool.acquire():
+                pass  # pragma: no cover
+
+    async def testConnectionPoolClosedWaitingAcquire(self) -> None:
+        pool = await self.createPool(max_size=1)
+        acquire = pool.acquire()
+        async with pool.acquire() as client:
+            acquire_task = self.loop.create_task(acquire.__aenter__())
+            await asyncio.sleep(0.1)
+            await pool.close()
+        self.assertTrue(client.is_closing())
+        with self.assertRaises(ncplib.ConnectionClosed):
+            await acquire_task
+
+    async def testConnectionPoolCloseError(self) -> None:
+        pool = await self.createPool()
+        async with pool.acquire() as client_1, pool.acquire() as client_2:
+            pass
+        wait_closed = ncplib.Connection.wait_closed
+        wait_closed_calls: List[ncplib.Connection] = []
+
+        async def wait_closed_error(connection: ncplib.Connection) -> None:
+            wait_closed_calls.append(connection)
+            await wait_closed(connection)
+            if len(wait_closed_calls) == 1:
+                raise ncplib.NetworkError("Boom!")
+
+        with mock.patch.object(ncplib.Connection, "wait_closed", wait_closed_error):
+            with self.assertLogs("ncplib.client", "WARNING"):
+                await pool.close()
+        self.assertCountEqual(wait_closed_calls, [client_1, client_2])
+        self.assertTrue(client_1.is_closing())
+        self.assertTrue(client_2.is_closing())
+
+    async def testConnectionPoolContextManager(self) -> None:
+        port = await self.createServer()
+        async with ncplib.ConnectionPool("127.0.0.1", port, hostname="ncplib-test") as pool:
+            async with pool.acquire() as client:
+                pass
+            self.assertFalse(client.is_closing())
+        self.assertTrue(client.is_closing())
+
+    async def testNoAutoFlags(self) -> None:
+        client = await self.createClient(auto_erro=False, auto_warn=False, auto_ackn=False)
+        response = client.send("LINK", "ECHO", WARN="Boom!", WARC=10)
+        self.assertEqual(await response.recv(), {"ACKN": True})
+        self.assertEqual(await response.recv(), {"WARN": "Boom!", "WARC": 10})
+
+    async def testPipelineAuth(self) -> None:
+        client = await self.createClient(pipeline_auth=True)
+        response = client.send("LINK", "ECHO", FOO="BAR")
+        await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+
+    async def testPipelineAuthSendsCareBeforeScar(self) -> None:
+        care_buffered: List[bool] = []
+
+        async def client_connected(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            async with _create_server_connecton(reader, writer, 60) as connection:
+                connection.send("LINK", "HELO")
+                await connection.recv_field("LINK", "CCRE")
+                # CARE is sent in the same write as CCRE, without waiting for SCAR.
+                care_buffered.append(len(reader._buffer) > 0)  # type: ignore
+                await asyncio.wait_for(connection.recv_field("LINK", "CARE"), 1)
+                connection.send("LINK", "SCAR", LINK=60)
+                connection.send("LINK", "SCON")
+                connection._apply_remote_timeout(60)
+                field = await connection.recv()
+                field.send(ACKN=True)
+                field.send(**field)
+        client = await self.createClientRaw(client_connected, pipeline_auth=True)
+        response = client.send("LINK", "ECHO", FOO="BAR")
+        await self.assertMessages(response, "LINK", {"ECHO": {"FOO": "BAR"}})
+        self.assertEqual(care_buffered, [True])
+
+
+@unittest.skipIf(uvloop is None, "uvloop is not installed")
+class UvloopClientServerTestCase(ClientServerTestCase):
+
+    def createLoop(self) -> asyncio.AbstractEventLoop:
+        return uvloop.new_event_loop()
+
+    # Tests.
+
+    async def testClientTransport(self) -> None:
+        client = await self.createClient()
+        self.assertIsInstance(client.transport, uvloop.loop.TCPTransport)  # type: ignore
@@ -1,10 +1,11 @@
 from __future__ import annotations
 import unittest
 from array import array
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from math import inf
+from sys import intern
 from typing import Sequence, Tuple
-from ncplib.packets import Param, encode_packet, decode_packet
+from ncplib.packets import Param, encode_packet, decode_packet, NAME_CACHE_SIZE, _name_cache
 from ncplib import u32, i64, u64, f64
 
 
@@ -148,3 +149,40 @@ class PacketDatasTestCase(unittest.TestCase):
                 self.assertIs(decoded_type, expected_value.__class__)
                 if decoded_type is array:
                     self.assertEqual(value.typecode, decoded_value.typecode)  # type: ignore
+
+    def testDecodeBytearray(self) -> None:
+        packet_timestamp = datetime.now(tz=timezone.utc)
+        for value, expected_value in PACKET_VALUES:
+            with self.subTest(type=value.__class__, value=value, expected_value=expected_value):
+                encoded_packet = encode_packet("PACK", 10, packet_timestamp, b"INFO", [
+                    ("FIEL", 20, [("PARA", value)]),
+                ])
+                self.assertEqual(decode_packet(bytearray(encoded_packet)), decode_packet(encoded_packet))
+
+    def testEncodeDecodeTimestamp(self) -> None:
+        packet_timestamp = datetime(2021, 2, 18, 12, 30, 15, 123456, tzinfo=timezone(timedelta(hours=-5)))
+        decoded_packet = decode_packet(encode_packet("PACK", 10, packet_timestamp, b"INFO", []))
+        self.assertEqual(decoded_packet[2], packet_timestamp)
+        self.assertEqual(decoded_packet[2].tzinfo, timezone.utc)
+
+    def testDecodeNameInterned(self) -> None:
+        packet_timestamp = datetime.now(tz=timezone.utc)
+        encoded_packet = encode_packet("PACK", 10, packet_timestamp, b"INFO", [("FIEL", 20, [("PARA", 1)])])
+        for _ in range(2):
+            packet_type, _, _, _, ((field_name, _, ((param_name, _),)),) = decode_packet(encoded_packet)
+            self.assertIs(packet_type, "PACK")
+            self.assertIs(field_name, "FIEL")
+            self.assertIs(param_name, "PARA")
+
+    def testDecodeNameCacheSize(self) -> None:
+        packet_timestamp = datetime.now(tz=timezone.utc)
+        for n in range(NAME_CACHE_SIZE + 1):
+            field_name = f"{n:04X}"
+            decoded_packet = decode_packet(encode_packet("PACK", 10, packet_timestamp, b"INFO", [(field_name, 20, [])]))
+            self.assertEqual(decoded_packet[-1][0][0], field_name)  # type: ignore
+        self.assertEqual(len(_name_cache), NAME_CACHE_SIZE)
+        # Names that don't fit in the cache are not interned.
+        field_name = f"{NAME_CACHE_SIZE:04X}"
+        self.assertNotIn(field_name.encode(), _name_cache)
+        decoded_packet = decode_packet(encode_packet("PACK", 10, packet_timestamp, b"INFO", [(field_name, 20, [])]))
+        self.assertIsNot(decoded_packet[-1][0][0], intern(field_name))  # type: ignore